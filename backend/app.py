@@ -2,12 +2,16 @@ from flask import Flask, send_from_directory
 from flask_cors import CORS
 from application.database import db
 from werkzeug.security import generate_password_hash
+from werkzeug.middleware.proxy_fix import ProxyFix
 from application.models import User, Complain
+from application.archive import reserve_archived_ids
+from config import Config
 import os
 from datetime import datetime
 
 def create_app():
     app = Flask(__name__)
+    app.config.from_object(Config)
     app.secret_key = 'secret'
     app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
     app.config['SESSION_COOKIE_SECURE'] = False 
@@ -23,8 +27,8 @@ def create_app():
         r"/*": {
             "origins": ["http://localhost:3000", "http://127.0.0.1:3000"],
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-            "allow_headers": ["Content-Type", "X-User-ID", "Authorization", "Accept"],
-            "expose_headers": ["Content-Type", "X-User-ID"],
+            "allow_headers": ["Content-Type", "X-User-ID", "X-Upload-Offset", "Authorization", "Accept"],
+            "expose_headers": ["Content-Type", "X-User-ID", "Retry-After"],
             "supports_credentials": True,
             "max_age": 600
         }
@@ -41,6 +45,9 @@ def create_app():
             db.create_all()
             
             print("✅ Database tables recreated successfully!")
+
+            # Archive files outlive the hot database, keep new IDs clear of them
+            reserve_archived_ids()
             
             # Create default admin user
             admin_password = generate_password_hash('admin123', method='pbkdf2:sha256', salt_length=8)
@@ -84,7 +91,7 @@ def create_app():
             print(" Default users and test report created successfully!")
             print(" Admin - Email: admin@example.com, Password: admin123")
             print(" User - Email: user@example.com, Password: user123")
-            print(" Test Report ID: 1 (for verification testing)")
+            print(f" Test Report ID: {test_report.id} (for verification testing)")
             
         except Exception as e:
             print(f" Error creating database: {e}")
@@ -95,10 +102,19 @@ def create_app():
     from application.controllers import auth_bp
     from application.controllers_reports import reports_bp
     from application.controllers_admin import admin_bp
+    from application.controllers_uploads import uploads_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(reports_bp, url_prefix='/api') 
     app.register_blueprint(admin_bp, url_prefix='/api')
+    app.register_blueprint(uploads_bp, url_prefix='/api')
+
+    # Rate limits key on remote_addr, which must be the client and not the proxy
+    if app.config.get('TRUSTED_PROXIES'):
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXIES'])
+
+    from application.ratelimit import init_rate_limiting
+    init_rate_limiting(app)
     
     # Create uploads directory
     os.makedirs('uploads', exist_ok=True)
@@ -0,0 +1,259 @@
+import os
+import re
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import bindparam, create_engine, func, text
+from .models import Complain, Media
+from .database import db
+
+# Complaints in these states are closed and can leave the hot table
+ARCHIVABLE_STATUSES = ('Resolved', 'Forwarded')
+
+ARCHIVE_FILE_PATTERN = re.compile(r'^complain_(\d{4})_(\d{2})\.db$')
+
+COMPLAIN_COLUMNS = [c.name for c in Complain.__table__.columns]
+MEDIA_COLUMNS = [c.name for c in Media.__table__.columns]
+
+# Archived complaints keep a copy of their author, because user IDs in the hot
+# database are handed out again after it is recreated on startup
+AUTHOR_COLUMNS = {'user_name': 'VARCHAR(80)', 'user_email': 'VARCHAR(120)'}
+
+
+def get_archive_folder():
+    return current_app.config['ARCHIVE_FOLDER']
+
+def archive_path(year, month):
+    return os.path.join(get_archive_folder(), f"complain_{year:04d}_{month:02d}.db")
+
+def archive_alias(year, month):
+    # Only built from integers, so it is safe to put straight into ATTACH
+    return f"archive_{year:04d}_{month:02d}"
+
+def list_archives(start=None, end=None):
+    """Return (year, month, path) for every archive file overlapping [start, end)."""
+    folder = get_archive_folder()
+    if not os.path.isdir(folder):
+        return []
+
+    archives = []
+    for name in sorted(os.listdir(folder)):
+        match = ARCHIVE_FILE_PATTERN.match(name)
+        if not match:
+            continue
+        year, month = int(match.group(1)), int(match.group(2))
+        month_start = datetime(year, month, 1)
+        month_end = datetime(year + month // 12, month % 12 + 1, 1)
+        if start and month_end <= start:
+            continue
+        if end and month_start >= end:
+            continue
+        archives.append((year, month, os.path.join(folder, name)))
+    return archives
+
+def ensure_archive_schema(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        db.metadata.create_all(engine, tables=[Complain.__table__, Media.__table__])
+        with engine.begin() as conn:
+            existing = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(complain)")}
+            for name, sql_type in AUTHOR_COLUMNS.items():
+                if name not in existing:
+                    conn.exec_driver_sql(f"ALTER TABLE complain ADD COLUMN {name} {sql_type}")
+    finally:
+        engine.dispose()
+
+def closed_at():
+    return func.coalesce(Complain.resolved_at, Complain.verified_at, Complain.date_created)
+
+def reserve_archived_ids():
+    """Move the hot tables' AUTOINCREMENT counters past every ID already archived.
+
+    The hot database is recreated on startup while archive files persist, so
+    without this new complaints would be handed IDs that already exist there.
+    """
+    highest = {'complain': 0, 'media': 0}
+    with db.engine.connect() as conn:
+        for year, month, path in list_archives():
+            alias = archive_alias(year, month)
+            conn.exec_driver_sql(f"ATTACH DATABASE ? AS {alias}", (path,))
+            try:
+                for table in highest:
+                    found = conn.exec_driver_sql(f"SELECT MAX(id) FROM {alias}.{table}").scalar()
+                    highest[table] = max(highest[table], found or 0)
+            finally:
+                conn.rollback()
+                conn.exec_driver_sql(f"DETACH DATABASE {alias}")
+                conn.commit()
+
+        with conn.begin():
+            for table, max_id in highest.items():
+                # sqlite_sequence has no unique key on name, so update before inserting
+                updated = conn.execute(
+                    text("UPDATE sqlite_sequence SET seq = :seq WHERE name = :name AND seq < :seq"),
+                    {'name': table, 'seq': max_id}
+                ).rowcount
+                exists = conn.execute(
+                    text("SELECT 1 FROM sqlite_sequence WHERE name = :name"), {'name': table}
+                ).first()
+                if not updated and not exists and max_id:
+                    conn.execute(
+                        text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"),
+                        {'name': table, 'seq': max_id}
+                    )
+    return highest
+
+def archive_complaints(days=None):
+    """Move complaints closed more than `days` ago, with their media, into monthly archive files.
+
+    Complaints are partitioned by the month they were created in, so a date range
+    on date_created maps directly onto the archive files that need attaching.
+    Complaints whose ID (or one of whose media IDs) already exists in the target
+    archive are left in the hot table and reported as conflicts.
+    """
+    if days is None:
+        days = current_app.config.get('ARCHIVE_AFTER_DAYS', 90)
+    cutoff = datetime.utcnow() - timedelta(days=days)
+
+    candidates = db.session.query(Complain.id, Complain.date_created, closed_at()).filter(
+        Complain.status.in_(ARCHIVABLE_STATUSES),
+        closed_at() < cutoff
+    ).all()
+    # Release the read transaction so the archive connection can write
+    db.session.commit()
+
+    by_month = {}
+    undated = {}
+    for complain_id, date_created, closed in candidates:
+        if date_created is None:
+            # Date range queries filter on date_created, so give undated rows one
+            undated[complain_id] = closed
+            date_created = closed
+        by_month.setdefault((date_created.year, date_created.month), []).append(complain_id)
+
+    complain_cols = ', '.join(COMPLAIN_COLUMNS)
+    source_cols = ', '.join(f"c.{name}" for name in COMPLAIN_COLUMNS)
+    media_cols = ', '.join(MEDIA_COLUMNS)
+    # Re-checked under the write lock, an admin may have reopened a complaint since
+    still_closed = text(
+        "SELECT id FROM main.complain WHERE id IN :ids AND status IN :statuses "
+        "AND COALESCE(resolved_at, verified_at, date_created) < :cutoff"
+    ).bindparams(
+        bindparam('ids', expanding=True),
+        bindparam('statuses', expanding=True),
+        bindparam('cutoff', type_=db.DateTime)
+    )
+    backfill_date = text(
+        "UPDATE main.complain SET date_created = :date_created WHERE id = :id"
+    ).bindparams(bindparam('date_created', type_=db.DateTime))
+
+    archived = {}
+    conflicts = []
+    for (year, month), ids in sorted(by_month.items()):
+        path = archive_path(year, month)
+        alias = archive_alias(year, month)
+        ensure_archive_schema(path)
+
+        find_conflicts = text(
+            f"SELECT id FROM {alias}.complain WHERE id IN :ids "
+            f"UNION SELECT complain_id FROM main.media WHERE complain_id IN :ids "
+            f"AND id IN (SELECT id FROM {alias}.media)"
+        ).bindparams(bindparam('ids', expanding=True))
+        copy_complaints = text(
+            f"INSERT INTO {alias}.complain ({complain_cols}, user_name, user_email) "
+            f"SELECT {source_cols}, u.name, u.email FROM main.complain c "
+            f"LEFT JOIN main.user u ON u.id = c.user_id WHERE c.id IN :ids"
+        ).bindparams(bindparam('ids', expanding=True))
+        copy_media = text(
+            f"INSERT INTO {alias}.media ({media_cols}) "
+            f"SELECT {media_cols} FROM main.media WHERE complain_id IN :ids"
+        ).bindparams(bindparam('ids', expanding=True))
+        delete_media = text(
+            "DELETE FROM main.media WHERE complain_id IN :ids"
+        ).bindparams(bindparam('ids', expanding=True))
+        delete_complaints = text(
+            "DELETE FROM main.complain WHERE id IN :ids"
+        ).bindparams(bindparam('ids', expanding=True))
+
+        with db.engine.connect() as conn:
+            # ATTACH is not allowed inside a transaction, so do it before begin()
+            conn.exec_driver_sql(f"ATTACH DATABASE ? AS {alias}", (path,))
+            conn.commit()
+            try:
+                # SQLite commits across attached databases atomically
+                with conn.begin():
+                    # IMMEDIATE locks every attached file for writing before the
+                    # re-check, so nothing can change between checking and moving
+                    conn.exec_driver_sql("BEGIN IMMEDIATE")
+                    ids = list(conn.execute(still_closed, {
+                        'ids': ids, 'statuses': list(ARCHIVABLE_STATUSES), 'cutoff': cutoff
+                    }).scalars())
+                    clashing = set(conn.execute(find_conflicts, {'ids': ids}).scalars()) if ids else set()
+                    conflicts.extend(sorted(clashing))
+                    ids = [i for i in ids if i not in clashing]
+                    if ids:
+                        for complain_id in ids:
+                            if complain_id in undated:
+                                conn.execute(backfill_date, {'id': complain_id, 'date_created': undated[complain_id]})
+                        conn.execute(copy_complaints, {'ids': ids})
+                        conn.execute(copy_media, {'ids': ids})
+                        conn.execute(delete_media, {'ids': ids})
+                        conn.execute(delete_complaints, {'ids': ids})
+            finally:
+                conn.exec_driver_sql(f"DETACH DATABASE {alias}")
+                conn.commit()
+
+        if ids:
+            archived[f"{year:04d}-{month:02d}"] = len(ids)
+
+    return archived, conflicts
+
+def query_archived_reports(start=None, end=None, user_email=None):
+    """Load archived complaints created in [start, end) by attaching the matching archive files.
+
+    Pass `user_email` to list one citizen's complaints; archived rows are matched
+    on the author copied at archive time, not on the reusable user ID.
+    """
+    conditions = []
+    params = {}
+    if start:
+        conditions.append("c.date_created >= :start")
+        params['start'] = start
+    if end:
+        conditions.append("c.date_created < :end")
+        params['end'] = end
+    if user_email:
+        conditions.append("c.user_email = :user_email")
+        params['user_email'] = user_email
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+    rows = []
+    with db.engine.connect() as conn:
+        for year, month, path in list_archives(start, end):
+            alias = archive_alias(year, month)
+            # Files written before the author columns existed get them added here
+            ensure_archive_schema(path)
+            query = text(
+                f"SELECT c.*, (SELECT COUNT(*) FROM {alias}.media m WHERE m.complain_id = c.id) "
+                f"AS media_count FROM {alias}.complain c {where}"
+            )
+            if start:
+                query = query.bindparams(bindparam('start', type_=db.DateTime))
+            if end:
+                query = query.bindparams(bindparam('end', type_=db.DateTime))
+            query = query.columns(
+                date_created=db.DateTime,
+                verified_at=db.DateTime,
+                resolved_at=db.DateTime,
+                is_verified=db.Boolean
+            )
+
+            conn.exec_driver_sql(f"ATTACH DATABASE ? AS {alias}", (path,))
+            try:
+                rows.extend(conn.execute(query, params).mappings().all())
+            finally:
+                conn.rollback()
+                conn.exec_driver_sql(f"DETACH DATABASE {alias}")
+
+    rows.sort(key=lambda r: r['date_created'] or datetime.min, reverse=True)
+    return rows
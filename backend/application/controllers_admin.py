@@ -1,16 +1,51 @@
 from flask import Blueprint, request, jsonify
 from .models import Complain, User
 from .database import db
+from .archive import archive_complaints, query_archived_reports
+from .controllers_reports import parse_date_arg
 from datetime import datetime  # ADD THIS IMPORT
 import traceback  # ADD THIS IMPORT
 
 admin_bp = Blueprint('admin', __name__)
 
+def serialize_archived_report(row):
+    return {
+        "id": row['id'],
+        "code": f"CMP-{row['id']:06d}",
+        "title": row['title'],
+        "description": row['description'],
+        "department": row['department'],
+        "status": row['status'],
+        "location": row['location'],
+        "date_created": row['date_created'].isoformat() if row['date_created'] else None,
+        "image_url": row['image_url'],
+        "is_verified": row['is_verified'],
+        "forwarded_to": row['forwarded_to'],
+        "verified_at": row['verified_at'].isoformat() if row['verified_at'] else None,
+        "archived": True,
+        "user": {
+            "id": row['user_id'],
+            "name": row['user_name'],
+            "email": row['user_email']
+        } if row['user_name'] else None
+    }
+
 @admin_bp.route('/admin/reports', methods=['GET'])
 def get_all_reports():
     try:
         print("Admin reports endpoint hit")
-        reports = Complain.query.order_by(Complain.date_created.desc()).all()
+        try:
+            date_from = parse_date_arg('from')
+            date_to = parse_date_arg('to', end=True)
+        except ValueError:
+            return jsonify({"error": "Dates must be in ISO format (YYYY-MM-DD)"}), 400
+
+        query = Complain.query
+        if date_from:
+            query = query.filter(Complain.date_created >= date_from)
+        if date_to:
+            query = query.filter(Complain.date_created < date_to)
+        reports = query.order_by(Complain.date_created.desc()).all()
         print(f"Found {len(reports)} reports")
         
         reports_data = []
@@ -34,6 +69,13 @@ def get_all_reports():
                     "email": report.user.email
                 } if report.user else None
             })
+
+        # Archived complaints are only read when a date range asks for history
+        if date_from or date_to:
+            archived = query_archived_reports(date_from, date_to)
+            print(f"Found {len(archived)} archived reports")
+            reports_data.extend(serialize_archived_report(row) for row in archived)
+            reports_data.sort(key=lambda r: r['date_created'] or '', reverse=True)
         
         return jsonify(reports_data), 200
         
@@ -52,6 +94,8 @@ def update_report(report_id):
         
         # Update fields if provided
         if 'status' in data:
+            if data['status'] == 'Resolved' and report.status != 'Resolved':
+                report.resolved_at = datetime.utcnow()
             report.status = data['status']
         if 'department' in data:
             report.department = data['department']
@@ -134,6 +178,33 @@ def verify_and_forward_report(report_id):
         traceback.print_exc()
         return jsonify({"error": f"Failed to verify and forward report: {str(e)}"}), 500
 
+@admin_bp.route('/admin/archive', methods=['POST'])
+def archive_old_reports():
+    try:
+        data = request.get_json(silent=True) or {}
+        days = data.get('days')
+        # bool is a subclass of int, so reject JSON true/false explicitly
+        if days is not None and (isinstance(days, bool) or not isinstance(days, int) or days < 0):
+            return jsonify({"error": "days must be a non-negative integer"}), 400
+
+        archived, conflicts = archive_complaints(days)
+        total = sum(archived.values())
+        print(f"Archived {total} reports: {archived}")
+        if conflicts:
+            print(f"Skipped reports already present in the archive: {conflicts}")
+
+        return jsonify({
+            "message": f"Archived {total} reports",
+            "archived": archived,
+            "conflicts": conflicts
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error archiving reports: {str(e)}")
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
 # Add a simple endpoint to test if admin routes are working
 @admin_bp.route('/admin/test')
 def admin_test():
@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify
 from werkzeug.utils import secure_filename
 import os
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from .models import Complain, Media, User
 from .database import db
+from .archive import query_archived_reports
 
 reports_bp = Blueprint('reports', __name__)
 
@@ -17,6 +18,19 @@ def get_current_user():
         return User.query.get(int(user_id))
     return None
 
+def parse_date_arg(name, end=False):
+    value = request.args.get(name)
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    # Stored dates are naive UTC, so convert values that carry an offset
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    # A bare date as the upper bound should include that whole day
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
 @reports_bp.route('/reports', methods=['GET'])
 def get_reports():
     try:
@@ -118,10 +132,21 @@ def get_my_reports():
         if not user:
             return jsonify({"error": "Unauthorized"}), 401
 
+        try:
+            date_from = parse_date_arg('from')
+            date_to = parse_date_arg('to', end=True)
+        except ValueError:
+            return jsonify({"error": "Dates must be in ISO format (YYYY-MM-DD)"}), 400
+
         # Get only current user's reports
-        reports = Complain.query.filter_by(user_id=user.id).order_by(Complain.date_created.desc()).all()
+        query = Complain.query.filter_by(user_id=user.id)
+        if date_from:
+            query = query.filter(Complain.date_created >= date_from)
+        if date_to:
+            query = query.filter(Complain.date_created < date_to)
+        reports = query.order_by(Complain.date_created.desc()).all()
         
-        return jsonify([{
+        reports_data = [{
             "id": r.id,
             "title": r.title,
             "description": r.description,
@@ -132,7 +157,27 @@ def get_my_reports():
             "location": r.location,
             "code": f"CMP-{r.id:06d}",
             "media_count": Media.query.filter_by(complain_id=r.id).count()
-        } for r in reports]), 200
+        } for r in reports]
+
+        # Archived history is only read when a date range asks for it
+        if date_from or date_to:
+            archived = query_archived_reports(date_from, date_to, user_email=user.email)
+            reports_data.extend({
+                "id": r['id'],
+                "title": r['title'],
+                "description": r['description'],
+                "department": r['department'],
+                "status": r['status'],
+                "date_created": r['date_created'].isoformat() if r['date_created'] else None,
+                "image_url": r['image_url'],
+                "location": r['location'],
+                "code": f"CMP-{r['id']:06d}",
+                "media_count": r['media_count'],
+                "archived": True
+            } for r in archived)
+            reports_data.sort(key=lambda r: r['date_created'] or '', reverse=True)
+
+        return jsonify(reports_data), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
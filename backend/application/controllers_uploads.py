@@ -0,0 +1,281 @@
+from flask import Blueprint, request, jsonify, current_app
+from werkzeug.utils import secure_filename
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime, timedelta
+from .models import Complain, Media, UploadSession
+from .database import db
+from .controllers_reports import allowed_file, get_current_user
+
+uploads_bp = Blueprint('uploads', __name__)
+
+# Bytes read from the request stream per write, keeps worker memory flat
+STREAM_BLOCK_SIZE = 64 * 1024
+
+# Temp files without a session are only removed once they are this old, so a
+# file created by a concurrent init that has not committed yet is left alone
+ORPHAN_GRACE_SECONDS = 300
+
+# Leading bytes of each accepted image format
+IMAGE_SIGNATURES = [
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+]
+
+def detect_image_type(path):
+    with open(path, 'rb') as f:
+        header = f.read(8)
+    for signature, image_type in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return image_type
+    return None
+
+def get_temp_folder():
+    return current_app.config.get('UPLOAD_TEMP_FOLDER', os.path.join('uploads', 'tmp'))
+
+def get_owned_session(upload_id, user):
+    session = UploadSession.query.get(upload_id)
+    if not session or session.user_id != user.id:
+        return None
+    return session
+
+def discard_session(session):
+    if os.path.exists(session.temp_path):
+        os.remove(session.temp_path)
+    db.session.delete(session)
+
+def expire_upload_sessions():
+    """Drop sessions older than UPLOAD_SESSION_TTL_HOURS and temp files no session owns."""
+    ttl = timedelta(hours=current_app.config.get('UPLOAD_SESSION_TTL_HOURS', 24))
+    stale = UploadSession.query.filter(UploadSession.created_at < datetime.utcnow() - ttl).all()
+    for session in stale:
+        discard_session(session)
+    db.session.commit()
+
+    # Sessions are wiped with the database on restart, leaving their files behind
+    temp_folder = get_temp_folder()
+    if not os.path.isdir(temp_folder):
+        return
+    known = {os.path.basename(path) for (path,) in db.session.query(UploadSession.temp_path)}
+    cutoff = time.time() - ORPHAN_GRACE_SECONDS
+    for name in os.listdir(temp_folder):
+        path = os.path.join(temp_folder, name)
+        if name.endswith('.part') and name not in known and os.path.getmtime(path) < cutoff:
+            os.remove(path)
+
+@uploads_bp.route('/uploads', methods=['POST'])
+def init_upload():
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({"error": "Unauthorized"}), 401
+
+        data = request.get_json(silent=True) or {}
+        filename = secure_filename(data.get('filename', ''))
+        size = data.get('size')
+
+        if not filename or not allowed_file(filename):
+            return jsonify({"error": "File type not allowed"}), 400
+        max_size = current_app.config.get('MAX_UPLOAD_SIZE', 16 * 1024 * 1024)
+        # bool is a subclass of int, so reject JSON true/false explicitly
+        if isinstance(size, bool) or not isinstance(size, int) or size <= 0:
+            return jsonify({"error": "size must be a positive integer"}), 400
+        if size > max_size:
+            return jsonify({"error": f"File exceeds the {max_size} byte limit"}), 413
+
+        expire_upload_sessions()
+        max_open = current_app.config.get('MAX_OPEN_UPLOADS_PER_USER', 5)
+        if UploadSession.query.filter_by(user_id=user.id).count() >= max_open:
+            return jsonify({"error": "Too many uploads in progress, finish or cancel one first"}), 429
+
+        upload_id = uuid.uuid4().hex
+        temp_folder = get_temp_folder()
+        os.makedirs(temp_folder, exist_ok=True)
+        temp_path = os.path.join(temp_folder, f"{upload_id}.part")
+        open(temp_path, 'wb').close()
+
+        session = UploadSession(
+            id=upload_id,
+            filename=filename,
+            temp_path=temp_path,
+            total_size=size,
+            received=0,
+            user_id=user.id
+        )
+        db.session.add(session)
+        db.session.commit()
+
+        return jsonify({
+            "upload_id": upload_id,
+            "offset": 0,
+            "chunk_size": current_app.config.get('UPLOAD_CHUNK_SIZE', 1024 * 1024)
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+@uploads_bp.route('/uploads/<upload_id>', methods=['GET'])
+def get_upload_status(upload_id):
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({"error": "Unauthorized"}), 401
+
+        session = get_owned_session(upload_id, user)
+        if not session:
+            return jsonify({"error": "Upload not found"}), 404
+
+        # Clients resume from here after a dropped connection
+        return jsonify({
+            "upload_id": session.id,
+            "offset": session.received,
+            "size": session.total_size
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@uploads_bp.route('/uploads/<upload_id>', methods=['PUT'])
+def upload_chunk(upload_id):
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({"error": "Unauthorized"}), 401
+
+        session = get_owned_session(upload_id, user)
+        if not session:
+            return jsonify({"error": "Upload not found"}), 404
+
+        try:
+            offset = int(request.headers.get('X-Upload-Offset', ''))
+        except ValueError:
+            return jsonify({"error": "X-Upload-Offset header is required"}), 400
+
+        # Only appends are allowed; a mismatch tells the client where to resume
+        if offset != session.received:
+            return jsonify({
+                "error": "Offset does not match bytes received",
+                "offset": session.received
+            }), 409
+
+        length = request.content_length
+        if not length:
+            return jsonify({"error": "Content-Length is required"}), 411
+        max_chunk = current_app.config.get('UPLOAD_CHUNK_SIZE', 1024 * 1024)
+        if length > max_chunk or offset + length > session.total_size:
+            return jsonify({"error": "Chunk too large"}), 413
+
+        written = 0
+        with open(session.temp_path, 'r+b') as f:
+            f.seek(offset)
+            while written < length:
+                block = request.stream.read(min(STREAM_BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                f.write(block)
+                written += len(block)
+            # Drop anything past what was actually received in a cut-off chunk
+            f.truncate(offset + written)
+
+        session.received = offset + written
+        db.session.commit()
+
+        return jsonify({
+            "upload_id": session.id,
+            "offset": session.received,
+            "size": session.total_size,
+            "complete": session.received == session.total_size
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+@uploads_bp.route('/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_upload(upload_id):
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({"error": "Unauthorized"}), 401
+
+        session = get_owned_session(upload_id, user)
+        if not session:
+            return jsonify({"error": "Upload not found"}), 404
+
+        if session.received != session.total_size:
+            return jsonify({
+                "error": "Upload is incomplete",
+                "offset": session.received,
+                "size": session.total_size
+            }), 409
+
+        data = request.get_json(silent=True) or {}
+        report = Complain.query.get(data.get('report_id') or 0)
+        if not report:
+            return jsonify({"error": "Report not found"}), 404
+        if report.user_id != user.id and user.type != 'admin':
+            return jsonify({"error": "Forbidden"}), 403
+
+        # The extension was checked at init, the content is checked here
+        image_type = detect_image_type(session.temp_path)
+        if not image_type:
+            discard_session(session)
+            db.session.commit()
+            return jsonify({"error": "File is not a valid image"}), 415
+
+        # upload_id is unique, and the extension follows the content, not the client's name
+        unique_name = f"{session.id}.{image_type}"
+        filepath = os.path.join('uploads', unique_name)
+        os.makedirs('uploads', exist_ok=True)
+        shutil.move(session.temp_path, filepath)
+
+        report.image_url = f"http://localhost:5000/uploads/{unique_name}"
+        media = Media(
+            filename=session.filename,
+            file_path=filepath,
+            user_id=user.id,
+            complain_id=report.id
+        )
+        db.session.add(media)
+        db.session.delete(session)
+        try:
+            db.session.commit()
+        except Exception:
+            # Put the file back so the session can be finalized again
+            shutil.move(filepath, session.temp_path)
+            raise
+
+        return jsonify({
+            "message": "Image attached successfully",
+            "report_id": report.id,
+            "image_url": report.image_url
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+@uploads_bp.route('/uploads/<upload_id>', methods=['DELETE'])
+def cancel_upload(upload_id):
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({"error": "Unauthorized"}), 401
+
+        session = get_owned_session(upload_id, user)
+        if not session:
+            return jsonify({"error": "Upload not found"}), 404
+
+        discard_session(session)
+        db.session.commit()
+
+        return jsonify({"message": "Upload cancelled"}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
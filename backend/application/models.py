@@ -16,6 +16,8 @@ class User(db.Model):
 
 class Complain(db.Model):
     __tablename__ = 'complain'
+    # Never reuse IDs of complaints moved out to the archive
+    __table_args__ = {'sqlite_autoincrement': True}
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=False)
@@ -35,11 +37,25 @@ class Complain(db.Model):
     forwarded_to = db.Column(db.String(200))  # Authority it was forwarded to
     verification_notes = db.Column(db.Text)   # Additional notes
 
+    # Set when an admin marks the complaint resolved; used by the archival job
+    resolved_at = db.Column(db.DateTime)
+
 class Media(db.Model):
     __tablename__ = 'media'
+    __table_args__ = {'sqlite_autoincrement': True}
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(200), nullable=False)
     file_path = db.Column(db.String(300), nullable=False)
     upload_date = db.Column(db.DateTime, default=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    complain_id = db.Column(db.Integer, db.ForeignKey('complain.id'), nullable=False)
\ No newline at end of file
+    complain_id = db.Column(db.Integer, db.ForeignKey('complain.id'), nullable=False)
+
+class UploadSession(db.Model):
+    __tablename__ = 'upload_session'
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex handed to the client
+    filename = db.Column(db.String(200), nullable=False)
+    temp_path = db.Column(db.String(300), nullable=False)
+    total_size = db.Column(db.Integer, nullable=False)
+    received = db.Column(db.Integer, default=0)  # Bytes written so far, i.e. the next offset
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -0,0 +1,189 @@
+import itertools
+import math
+import sqlite3
+import threading
+import time
+from flask import request, jsonify, g
+
+# Endpoints that load whole tables or hash passwords get their own, smaller budgets
+# and cheap, high-volume traffic (report images, upload chunks) gets larger ones
+ROUTE_CLASSES = {
+    'reports.get_reports': 'expensive',
+    'admin.get_all_reports': 'expensive',
+    'auth.login': 'auth',
+    'auth.register': 'auth',
+    'serve_uploaded_file': 'media',
+    'static': 'media',
+    'uploads.upload_chunk': 'upload',
+}
+
+# (tokens refilled per second, bucket size) for each route class
+DEFAULT_RATE_LIMITS = {
+    'default': (10.0, 40),
+    'expensive': (1.0, 5),
+    'auth': (0.2, 5),
+    'media': (50.0, 200),
+    'upload': (20.0, 60),
+}
+
+
+class MemoryBucketStore:
+    """Token buckets kept in this process; the default for a single worker."""
+
+    # Buckets idle this long have refilled and can be forgotten
+    IDLE_SECONDS = 3600
+    PRUNE_THRESHOLD = 10000
+
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def prune(self, now):
+        cutoff = now - self.IDLE_SECONDS
+        self.buckets = {k: v for k, v in self.buckets.items() if v[1] >= cutoff}
+
+    def take(self, keys, rate, burst, now=None):
+        """Take one token from every bucket in `keys`, or from none of them.
+
+        Returns 0 if allowed, otherwise the seconds until all buckets have a token.
+        """
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            if len(self.buckets) > self.PRUNE_THRESHOLD:
+                self.prune(now)
+            levels = {}
+            for key in keys:
+                tokens, updated = self.buckets.get(key, (burst, now))
+                levels[key] = min(burst, tokens + (now - updated) * rate)
+            wait = max([(1 - tokens) / rate for tokens in levels.values() if tokens < 1], default=0)
+            for key, tokens in levels.items():
+                self.buckets[key] = (tokens if wait else tokens - 1, now)
+            return wait
+
+
+class SQLiteBucketStore:
+    """Token buckets in a shared SQLite file so several worker processes share budgets."""
+
+    IDLE_SECONDS = MemoryBucketStore.IDLE_SECONDS
+    # Idle rows are deleted once every this many takes
+    PRUNE_EVERY = 1000
+    # Waiting longer than this for the write lock costs more than the limit saves
+    LOCK_TIMEOUT = 0.1
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self.calls = itertools.count(1)
+        with self.connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_bucket ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def connect(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.LOCK_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Losing the last few bucket updates in a power cut is fine, an fsync per request is not
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def take(self, keys, rate, burst, now=None):
+        # Wall clock, since monotonic time is not comparable across processes
+        now = time.time() if now is None else now
+        conn = self.connect()
+        try:
+            # IMMEDIATE takes the write lock up front so read-modify-write is atomic
+            conn.execute("BEGIN IMMEDIATE")
+            levels = {}
+            for key in keys:
+                row = conn.execute(
+                    "SELECT tokens, updated FROM rate_bucket WHERE key = ?", (key,)
+                ).fetchone()
+                tokens, updated = row if row else (burst, now)
+                levels[key] = min(burst, tokens + max(0, now - updated) * rate)
+            wait = max([(1 - tokens) / rate for tokens in levels.values() if tokens < 1], default=0)
+            conn.executemany(
+                "INSERT OR REPLACE INTO rate_bucket (key, tokens, updated) VALUES (?, ?, ?)",
+                [(key, tokens if wait else tokens - 1, now) for key, tokens in levels.items()]
+            )
+            if next(self.calls) % self.PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM rate_bucket WHERE updated < ?", (now - self.IDLE_SECONDS,))
+            conn.execute("COMMIT")
+        except sqlite3.OperationalError as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            # A busy store must not turn a burst into a wall of 500s; let the
+            # request through and leave the concurrency cap to shed load
+            print(f"Rate limit store unavailable, admitting request: {e}")
+            return 0
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+def retry_after(seconds):
+    return str(max(1, math.ceil(seconds)))
+
+def get_client_keys():
+    # X-User-ID is not authenticated, so keying on it would let anyone drain
+    # another user's budget. Behind a proxy set TRUSTED_PROXIES so that
+    # remote_addr is the real client rather than the proxy.
+    return [f"ip:{request.remote_addr}"]
+
+def init_rate_limiting(app):
+    """Register per-client token buckets and a global in-flight request cap on `app`.
+
+    RATE_LIMIT_STORAGE is 'memory' or the path of a SQLite file shared by all
+    workers. MAX_CONCURRENT_REQUESTS caps in-flight requests per process, and
+    shed requests are told to come back after LOAD_SHED_RETRY_AFTER seconds.
+    """
+    if not app.config.get('RATE_LIMIT_ENABLED', True):
+        return
+
+    storage = app.config.get('RATE_LIMIT_STORAGE', 'memory')
+    store = MemoryBucketStore() if storage == 'memory' else SQLiteBucketStore(storage)
+    limits = {**DEFAULT_RATE_LIMITS, **app.config.get('RATE_LIMITS', {})}
+    for route_class, (rate, burst) in limits.items():
+        if rate <= 0 or burst < 1:
+            raise ValueError(
+                f"RATE_LIMITS['{route_class}'] needs a rate above 0 and a burst of at least 1, "
+                f"got ({rate}, {burst})"
+            )
+
+    max_concurrent = app.config.get('MAX_CONCURRENT_REQUESTS')
+    slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+    shed_retry_after = app.config.get('LOAD_SHED_RETRY_AFTER', 1)
+
+    @app.before_request
+    def admit_request():
+        # CORS preflights are cheap and must not eat into the budget
+        if request.method == 'OPTIONS':
+            return None
+
+        # Check the bucket before taking a slot so throttled clients never occupy one
+        route_class = ROUTE_CLASSES.get(request.endpoint, 'default')
+        rate, burst = limits[route_class]
+        keys = [f"{route_class}:{key}" for key in get_client_keys()]
+        wait = store.take(keys, rate, burst)
+        if wait:
+            response = jsonify({"error": "Too many requests, please slow down"})
+            response.headers['Retry-After'] = retry_after(wait)
+            return response, 429
+
+        if slots is not None:
+            if not slots.acquire(blocking=False):
+                response = jsonify({"error": "Server is busy, please retry shortly"})
+                response.headers['Retry-After'] = retry_after(shed_retry_after)
+                return response, 503
+            g.admission_slot = True
+        return None
+
+    @app.teardown_request
+    def release_slot(exc):
+        if g.pop('admission_slot', False):
+            slots.release()
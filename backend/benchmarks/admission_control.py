@@ -0,0 +1,142 @@
+"""Overload benchmark for the rate limiter and concurrency cap.
+
+Fires far more concurrent clients at /api/admin/reports than the server can
+handle and prints goodput and latency percentiles of the requests that were
+served, with and without admission control. Each client connects from its own
+127.0.0.x address so it gets its own rate limit bucket, as distinct users
+would. Runs against a throwaway database:
+
+    python benchmarks/admission_control.py --clients 64 --requests 5
+"""
+import argparse
+import contextlib
+import http.client
+import io
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from werkzeug.serving import make_server
+from application.database import db
+from application.models import User, Complain
+from application.ratelimit import init_rate_limiting
+
+
+def build_app(db_path, reports, **config):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config.update(config)
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        if not User.query.first():
+            user = User(name='Bench', email='bench@example.com', password='x',
+                        address='Bench Street', pincode='000000')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add_all(Complain(
+                title=f'Report {i}',
+                description='Benchmark report ' * 10,
+                location='Bench City',
+                department='Sanitation',
+                status='Pending',
+                user_id=user.id
+            ) for i in range(reports))
+            db.session.commit()
+
+    from application.controllers_admin import admin_bp
+    app.register_blueprint(admin_bp, url_prefix='/api')
+    init_rate_limiting(app)
+    return app
+
+def run_load(port, path, clients, requests_per_client):
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def client(n):
+        # Linux routes all of 127.0.0.0/8 to loopback, so each client can bind its own address
+        source = (f"127.0.{n // 250}.{n % 250 + 2}", 0)
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            conn = http.client.HTTPConnection('127.0.0.1', port, source_address=source)
+            try:
+                conn.request('GET', path)
+                resp = conn.getresponse()
+                resp.read()
+                status = resp.status
+                retry_after = resp.getheader('Retry-After')
+            finally:
+                conn.close()
+            elapsed = time.perf_counter() - start
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    latencies.append(elapsed)
+            if retry_after:
+                # Well-behaved clients honour Retry-After instead of retrying at once
+                time.sleep(float(retry_after))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(client, range(clients)))
+    return latencies, statuses, time.perf_counter() - started
+
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=5)
+    parser.add_argument('--reports', type=int, default=5000)
+    parser.add_argument('--max-concurrent', type=int, default=4)
+    args = parser.parse_args()
+
+    # Budgets high enough that only the concurrency cap kicks in
+    unthrottled = {name: (1000.0, 1000) for name in ('default', 'expensive', 'auth')}
+    scenarios = [
+        ('no admission control', {'RATE_LIMIT_ENABLED': False}),
+        ('concurrency cap', {'RATE_LIMITS': unthrottled,
+                             'MAX_CONCURRENT_REQUESTS': args.max_concurrent}),
+        ('rate limit + cap', {'MAX_CONCURRENT_REQUESTS': args.max_concurrent}),
+    ]
+
+    # Keep the request log and the endpoint's debug prints out of the results
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        print(f"{args.clients} clients x {args.requests} requests, {args.reports} reports")
+        print(f"{'scenario':<22}{'ok':>6}{'429':>6}{'503':>6}{'ok/s':>8}"
+              f"{'p50 ms':>10}{'p99 ms':>10}{'secs':>8}")
+        for name, config in scenarios:
+            app = build_app(db_path, args.reports, **config)
+            server = make_server('127.0.0.1', 0, app, threaded=True)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    latencies, statuses, elapsed = run_load(
+                        server.server_port, '/api/admin/reports', args.clients, args.requests)
+            finally:
+                server.shutdown()
+            ok = statuses.get(200, 0)
+            print(f"{name:<22}{ok:>6}{statuses.get(429, 0):>6}"
+                  f"{statuses.get(503, 0):>6}{ok / elapsed:>8.1f}{percentile(latencies, 50) * 1000:>10.1f}"
+                  f"{percentile(latencies, 99) * 1000:>10.1f}{elapsed:>8.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -8,4 +8,20 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
-    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp'}
\ No newline at end of file
+    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp'}
+    UPLOAD_TEMP_FOLDER = os.path.join(UPLOAD_FOLDER, 'tmp')
+    MAX_UPLOAD_SIZE = 16 * 1024 * 1024  # Total size of a resumable upload
+    UPLOAD_CHUNK_SIZE = 1024 * 1024  # Largest chunk accepted per PUT
+    UPLOAD_SESSION_TTL_HOURS = 24  # Unfinished uploads are discarded after this
+    MAX_OPEN_UPLOADS_PER_USER = 5
+    ARCHIVE_FOLDER = os.path.join(BASE_DIR, 'archive')
+    ARCHIVE_AFTER_DAYS = 90  # Archive resolved/forwarded complaints older than this
+    RATE_LIMIT_ENABLED = True
+    RATE_LIMIT_STORAGE = 'memory'  # Or a SQLite file path shared by all workers
+    RATE_LIMITS = {}  # Overrides for DEFAULT_RATE_LIMITS in application/ratelimit.py
+    MAX_CONCURRENT_REQUESTS = 16  # In-flight requests per worker before shedding with 503
+    LOAD_SHED_RETRY_AFTER = 1  # Retry-After seconds sent with a 503
+    # Reverse proxies in front of the app whose X-Forwarded-For is trusted. Leave at 0
+    # when serving directly; behind nginx or a load balancer set it to the number of
+    # hops, otherwise every client shares the proxy's address and its rate limit.
+    TRUSTED_PROXIES = 0
\ No newline at end of file
@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from application.database import db
+from application.archive import reserve_archived_ids
+from application.models import User
+
+
+def reset_database():
+    """Recreate the hot tables the way create_app does on every start."""
+    db.drop_all()
+    db.create_all()
+    reserve_archived_ids()
+    db.session.add(User(name='Test User', email='user@example.com', password='x',
+                        address='Test Address', pincode='560001'))
+    db.session.commit()
+
+
+@pytest.fixture
+def app(tmp_path):
+    # Built by hand because importing app.py would recreate the real complain.db
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'complain.db'}"
+    app.config['ARCHIVE_FOLDER'] = str(tmp_path / 'archive')
+    app.config['TESTING'] = True
+    db.init_app(app)
+
+    from application.controllers_reports import reports_bp
+    from application.controllers_admin import admin_bp
+    app.register_blueprint(reports_bp, url_prefix='/api')
+    app.register_blueprint(admin_bp, url_prefix='/api')
+
+    with app.app_context():
+        reset_database()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+from application.archive import archive_complaints
+from application.database import db
+from application.models import Complain, Media, User
+from conftest import reset_database
+
+OLD = datetime.utcnow() - timedelta(days=200)
+RANGE = f"from={(OLD - timedelta(days=1)).date()}"
+
+
+def add_complaint(status='Resolved', closed=OLD, **fields):
+    user = User.query.filter_by(email='user@example.com').first()
+    complaint = Complain(title='Pothole', description='Deep pothole', department='Road Maintenance',
+                         status=status, user_id=user.id, date_created=OLD, resolved_at=closed, **fields)
+    db.session.add(complaint)
+    db.session.flush()
+    db.session.add(Media(filename='a.png', file_path='uploads/a.png', user_id=user.id,
+                         complain_id=complaint.id))
+    db.session.commit()
+    return complaint.id
+
+
+def test_archive_moves_closed_complaints_and_media(client):
+    archived_id = add_complaint()
+    open_id = add_complaint(status='Pending')
+    recent_id = add_complaint(closed=datetime.utcnow())
+
+    archived, conflicts = archive_complaints(90)
+
+    assert archived == {f"{OLD.year:04d}-{OLD.month:02d}": 1}
+    assert conflicts == []
+    assert {c.id for c in Complain.query.all()} == {open_id, recent_id}
+    assert Media.query.filter_by(complain_id=archived_id).count() == 0
+
+    # Without a range only the hot table is read
+    hot = client.get('/api/admin/reports').get_json()
+    assert archived_id not in {r['id'] for r in hot}
+
+    ranged = client.get(f'/api/admin/reports?{RANGE}').get_json()
+    row = next(r for r in ranged if r['id'] == archived_id)
+    assert row['archived'] is True
+    assert row['user']['email'] == 'user@example.com'
+
+
+def test_my_reports_include_archived_history(client):
+    archived_id = add_complaint()
+    archive_complaints(90)
+    headers = {'X-User-ID': str(User.query.first().id)}
+
+    assert client.get('/api/my-reports', headers=headers).get_json() == []
+    history = client.get(f'/api/my-reports?{RANGE}', headers=headers).get_json()
+    assert [(r['id'], r['media_count'], r['archived']) for r in history] == [(archived_id, 1, True)]
+
+
+def test_ids_are_not_reused_after_restart(client):
+    first_id = add_complaint()
+    archive_complaints(90)
+
+    # A restart wipes the hot database but keeps the archive files
+    reset_database()
+    # Hand the archived author's user ID to somebody else
+    User.query.delete()
+    db.session.add(User(name='Someone Else', email='else@example.com', password='x',
+                        address='Elsewhere', pincode='000000'))
+    db.session.add(User(name='Test User', email='user@example.com', password='x',
+                        address='Test Address', pincode='560001'))
+    db.session.commit()
+    assert User.query.get(1).email == 'else@example.com'
+    second_id = add_complaint()
+    assert second_id > first_id
+
+    archived, conflicts = archive_complaints(90)
+    assert sum(archived.values()) == 1
+    assert conflicts == []
+
+    ranged = client.get(f'/api/admin/reports?{RANGE}').get_json()
+    assert {r['id'] for r in ranged} == {first_id, second_id}
+    # Authors come from the archive copy, not whoever holds that user ID now
+    assert {r['user']['email'] for r in ranged} == {'user@example.com'}
+
+
+def test_offset_dates_are_accepted(client):
+    response = client.get('/api/admin/reports?from=2000-01-01T00:00:00%2B05:00')
+    assert response.status_code == 200